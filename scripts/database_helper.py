@@ -2,18 +2,39 @@
 This is a wrapper for database access using sqlalchemy.
 
 """
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from threading import Lock
+from urllib.parse import quote
+
 from sqlalchemy import create_engine
-from sqlalchemy import MetaData, Table
+from sqlalchemy import MetaData, Table, text
 from sqlalchemy.orm import sessionmaker
 
 
+CONNECTION_STRING_TEMPLATES = {
+    'mysql': 'mysql+pymysql://{uname}:{passwd}@{host}:{port}/{db}',
+    'mssql': 'mssql+pymssql://{uname}:{passwd}@{host}:{port}/{db}'
+}
+MAX_BATCH_SIZE = 5000
+# Keep each multi-row INSERT under the driver packet limit (bytes).
+MAX_STATEMENT_LENGTH = 1024 * 1024
+# Approximate bytes added per value for quoting and separators.
+ROW_VALUE_OVERHEAD = 4
+# Number of rows fetched per round-trip when reading stored procedure results.
+PROC_FETCH_SIZE = 5000
+# Number of rows buffered per round-trip when streaming query results.
+QUERY_YIELD_PER = 1000
+
+
 class DatabaseHelper(object):
     """
     Database Helper class.
     """
 
     def __init__(
-            self, server_type, username, password, server, port=3306, database=None, lightweight=False, charset=''):
+            self, server_type, username, password, server, port=3306, database=None, lightweight=False, charset='',
+            pool_size=10, max_overflow=20, pool_recycle=1800):
         """
         Initialize db helper.
         :param server_type: string - either 'mysql' or 'mssql' and indicates type of target sql server.
@@ -23,6 +44,9 @@ class DatabaseHelper(object):
         :param port: int - db server port.
         :param database: string - db to connect to.
         :param charset: string - the database character set.
+        :param pool_size: int - number of connections kept open in the connection pool.
+        :param max_overflow: int - number of connections allowed on top of pool_size.
+        :param pool_recycle: int - seconds after which a pooled connection is replaced.
         """
         _db_login_str = self.build_connection_string(
             server_type=server_type,
@@ -34,22 +58,38 @@ class DatabaseHelper(object):
             charset=charset
         )
 
-        self.db_engine = create_engine(_db_login_str)
+        # Connections are checked out from the pool per call, pre-ping replaces connections
+        # that were dropped by the server or a firewall before they are used.
+        self.db_engine = create_engine(
+            _db_login_str,
+            pool_pre_ping=True,
+            pool_recycle=pool_recycle,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            future=True
+        )
+        # One worker per pooled connection so that async queries never wait on checkout. A
+        # negative max_overflow means no overflow limit, the executor default is used then.
+        self._max_workers = max(1, pool_size + max_overflow) if max_overflow >= 0 else None
+        self._executor = None
+        self._executor_lock = Lock()
+        # Build the Session class once, expire_on_commit=False avoids reloading attributes
+        # with an extra SELECT after each commit.
+        self._session_factory = sessionmaker(bind=self.db_engine, expire_on_commit=False, future=True)
 
         if not lightweight:
-            self.metadata = MetaData(bind=self.db_engine)
-            try:
-                self.db_cxn = self.db_engine.connect()
-            except TypeError:
-                # One retry
-                self.db_cxn = self.db_engine.connect()
+            self.metadata = MetaData()
+            self._table_cache = {}
 
-    def __del__(self):
+    def close(self):
         """
-        Destructor close db connection.
+        Waits for submitted queries to finish, then closes all pooled db connections.
         """
-        if hasattr(self, 'db_cxn') and not self.db_cxn.closed:
-            self.db_cxn.close()
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.db_engine.dispose()
 
     @staticmethod
     def build_connection_string(server_type, username, password, server, port=3306, database=None, charset=None):
@@ -64,16 +104,14 @@ class DatabaseHelper(object):
         :param charset: string - db character set.
         :return: string - connection string.
         """
-        if server_type not in ['mysql', 'mssql']:
+        try:
+            template = CONNECTION_STRING_TEMPLATES[server_type]
+        except KeyError:
             return None
-        server_types = {
-            'mysql': '{server}+pymysql://{uname}:{passwd}@{host}:{port}/{db}',
-            'mssql': '{server}+pymssql://{uname}:{passwd}@{host}:{port}/{db}'
-        }
-        cxn_str = server_types[server_type].format(
-            server=server_type,
-            uname=username,
-            passwd=password,
+        # Credentials may contain URL reserved characters such as '@' or '/'.
+        cxn_str = template.format(
+            uname=quote(username or '', safe=''),
+            passwd=quote(password or '', safe=''),
             host=server,
             port=port,
             db=database or ''
@@ -82,64 +120,210 @@ class DatabaseHelper(object):
             cxn_str += '?charset={}'.format(charset)
         return cxn_str
 
-    def bulk_load_records(self, table_name, records):
+    def bulk_load_records(self, table_name, records, batch_size=None, commit_every=None):
         """
-        Bulk inserts records into table.
+        Bulk inserts records into table. Records are sent in batches through a single
+        statement, which SQLAlchemy compiles once and passes to the driver's executemany,
+        so that the driver can issue multi-row INSERT statements instead of one round-trip
+        per row.
         :param table_name: string - name of target table.
-        :param records: list of dicts - records to bulk insert.
+        :param records: iterable of dicts - records to bulk insert, consumed one batch at a time
+            so generators and readers don't need to be materialized.
+        :param batch_size: int - number of records per INSERT, auto-tuned from row width when not set.
+        :param commit_every: int - number of batches per transaction, all batches are committed
+            in a single transaction when not set.
+        """
+        records = iter(records)
+        first_record = next(records, None)
+        if first_record is None:
+            return
+        insert_stmt = self.get_table(name=table_name).insert()
+        batch_size = batch_size or self.estimate_batch_size(first_record)
+        records = chain([first_record], records)
+
+        with self.db_engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                batch_count = 0
+                while True:
+                    batch = list(islice(records, batch_size))
+                    if not batch:
+                        break
+                    connection.execute(insert_stmt, batch)
+                    batch_count += 1
+                    if commit_every and batch_count % commit_every == 0:
+                        transaction.commit()
+                        transaction = connection.begin()
+                transaction.commit()
+            except Exception:
+                transaction.rollback()
+                raise
+
+    @staticmethod
+    def estimate_batch_size(record):
+        """
+        Estimates how many records fit in a single multi-row INSERT statement without going
+        over the driver packet limit.
+        :param record: dict - sample record.
+        :return: int - batch size, at most MAX_BATCH_SIZE.
         """
-        target_table = self.get_table(name=table_name)
-        target_table.insert().execute(records)
+        row_width = sum(len(str(value)) + ROW_VALUE_OVERHEAD for value in record.values()) or 1
+        return max(1, min(MAX_BATCH_SIZE, MAX_STATEMENT_LENGTH // row_width))
 
-    def execute_call_procedure(self, proc_name, params=None):
+    def execute_call_procedure(self, proc_name, params=None, stream=False):
         """
         Wrapper for executing a stored procedure.
         :param proc_name: string - stored procedure that should be called
         :param params: list - arguments that should be passed to the stored in parameters (in order).
-        :return: result from stored procedure call.
+        :param stream: boolean - yield rows in batches of PROC_FETCH_SIZE from an unbuffered cursor
+            (SSCursor for pymysql) instead of buffering the whole result, False as default.
+        :return: result from stored procedure call, a generator of rows when stream is True.
         """
+        if stream:
+            return self._stream_call_procedure(proc_name, params)
 
         connection = self.db_engine.raw_connection()
         results = None
         try:
-            cursor = connection.cursor()
-            if params and isinstance(params, list):
-                cursor.callproc(proc_name, params)
-            else:
-                cursor.callproc(proc_name)
-            results = list(cursor.fetchall())
+            cursor = self._call_procedure(connection, proc_name, params)
+            results = cursor.fetchall()
             cursor.close()
             connection.commit()
         finally:
             connection.close()
         return results
 
-    def execute_query(self, query, db_connection=None):
+    def _stream_call_procedure(self, proc_name, params=None):
+        """
+        Generator yielding the rows of a stored procedure call, fetched in batches. The driver's
+        unbuffered cursor is used when it has one, so rows are read from the server as they
+        are consumed. The connection is released once the generator is exhausted or closed.
+        :param proc_name: string - stored procedure that should be called
+        :param params: list - arguments that should be passed to the stored in parameters (in order).
+        """
+        # pymysql and MySQLdb buffer the whole result in their default cursor.
+        cursor_class = getattr(getattr(self.db_engine.dialect.dbapi, 'cursors', None), 'SSCursor', None)
+        connection = self.db_engine.raw_connection()
+        try:
+            cursor = self._call_procedure(connection, proc_name, params, cursor_class=cursor_class)
+            try:
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+            finally:
+                cursor.close()
+            connection.commit()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _call_procedure(connection, proc_name, params=None, cursor_class=None):
+        """
+        Calls a stored procedure on a raw db connection.
+        :param connection: raw DBAPI connection.
+        :param proc_name: string - stored procedure that should be called
+        :param params: list - arguments that should be passed to the stored in parameters (in order).
+        :param cursor_class: DBAPI cursor class to use, the driver default when not set.
+        :return: DBAPI cursor holding the procedure results.
+        """
+        cursor = connection.cursor(cursor_class) if cursor_class else connection.cursor()
+        cursor.arraysize = PROC_FETCH_SIZE
+        if params and isinstance(params, list):
+            cursor.callproc(proc_name, params)
+        else:
+            cursor.callproc(proc_name)
+        return cursor
+
+    def execute_query(self, query, db_connection=None, stream=False):
         """
         Wrapper to execute a query.
         :param query: query to execute.
         :param db_connection: db connection to use.
-        :return:
+        :param stream: boolean - yield rows from a server side cursor, QUERY_YIELD_PER rows at
+            a time, instead of buffering the whole result, False as default.
+        :return: list of rows for queries that return rows, number of affected rows otherwise.
+            The raw result is returned when db_connection is given and a generator of rows
+            when stream is True.
         """
+        if isinstance(query, str):
+            query = text(query)
+        if stream:
+            return self._stream_query(query, db_connection=db_connection)
         if db_connection:
             return db_connection.execute(query)
-        return self.db_cxn.execute(query)
+        with self.db_engine.begin() as connection:
+            result = connection.execute(query)
+            return result.fetchall() if result.returns_rows else result.rowcount
+
+    def _stream_query(self, query, db_connection=None):
+        """
+        Generator yielding the rows of a query read through a server side cursor.
+        :param query: query to execute.
+        :param db_connection: db connection to use.
+        """
+        if db_connection:
+            for row in self._execute_streamed(db_connection, query):
+                yield row
+            return
+        with self.db_engine.connect() as connection:
+            for row in self._execute_streamed(connection, query):
+                yield row
+
+    @staticmethod
+    def _execute_streamed(connection, query):
+        """
+        Executes a query with an unbuffered cursor (SSCursor for pymysql).
+        :param connection: db connection to use.
+        :param query: query to execute.
+        :return: sqlalchemy result fetching QUERY_YIELD_PER rows per round-trip.
+        """
+        # Options are passed per statement, connection.execution_options() would change a
+        # caller's future connection in place.
+        return connection.execute(
+            query, execution_options={'stream_results': True, 'yield_per': QUERY_YIELD_PER})
+
+    def submit_query(self, query):
+        """
+        Submits a query to be executed in a background thread on its own pooled connection.
+        :param query: query to execute.
+        :return: concurrent.futures.Future resolving to the execute_query result.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        return self._executor.submit(self.execute_query, query)
+
+    def execute_many_async(self, queries):
+        """
+        Submits independent queries to run concurrently. Results can be collected with
+        concurrent.futures.as_completed or by calling result() on each future.
+        :param queries: iterable of queries to execute.
+        :return: list of concurrent.futures.Future in the same order as queries.
+        """
+        return [self.submit_query(query) for query in queries]
 
     def get_session(self):
         """
         Create a database connection session.
         :return: object sqlalchemy Session to for current db connection.
         """
-        session = sessionmaker(bind=self.db_engine)
-        return session()
+        return self._session_factory()
 
     def get_table(self, name):
         """
-        Creates a table cursor.
-        :param name:
-        :return:
+        Creates a table cursor. Tables are reflected once and cached by name.
+        :param name: string - name of table.
+        :return: object sqlalchemy Table.
         """
-        return Table(name, self.metadata, autoload=True)
+        table = self._table_cache.get(name)
+        if table is None:
+            table = Table(name, self.metadata, autoload_with=self.db_engine)
+            self._table_cache[name] = table
+        return table
 
     def print_query(self, query):
         """
@@ -1,28 +1,46 @@
 """
-This script implements a simple wrapper that utilizes zc lock.
+This script implements a simple file lock on top of fcntl.flock.
+
+Verbose status messages go through the module logger, contention is reported as a
+warning and the other messages at INFO level, so logging must be configured to see them.
 
 A context manager is also provided, and it can be used as follows:
+    >>logging.basicConfig(level=logging.INFO)
     >>with file_lock('/path/to/lock/file', verbose=True) as fl:
     >>    print fl
     >>    // Do some other things.
 
 """
 from contextlib import contextmanager
-from zc.lockfile import LockError, LockFile
+
+import fcntl
+import logging
+import os
+import socket
+import time
+
+
+LOCK_RETRY_INTERVAL = 0.01
+
+log = logging.getLogger(__name__)
 
 
 @contextmanager
-def file_lock(lock_file, verbose=False):
+def file_lock(lock_file, verbose=False, timeout=0):
     """
     Context manager for FileLock.
     :param lock_file: string - full path to file that should contain lock.
     :param verbose: boolean - verbosity, False as default.
+    :param timeout: float - seconds to keep retrying while the lock is held elsewhere,
+        0 as default which gives up immediately.
     :return: File lock object if lock was successfully acquired, None otherwise.
     """
     fl = FileLock()
-    fl.acquire_lock(lock_file=lock_file, verbose=verbose)
-    yield fl.lock
-    del fl
+    try:
+        fl.acquire_lock(lock_file=lock_file, verbose=verbose, timeout=timeout)
+        yield fl.lock
+    finally:
+        fl.release_lock()
 
 
 class FileLock(object):
@@ -39,37 +57,46 @@ class FileLock(object):
         """
         self.lock = None
 
-    def __del__(self):
-        """
-        Release lock on exist.
-        """
-        if self.lock:
-            self.lock.close()
-
-    def acquire_lock(self, lock_file, verbose=False):
+    def acquire_lock(self, lock_file, verbose=False, timeout=0):
         """
         Attempts to acquire lock. This is to ensure that there is only one process
         running this script.
         :param lock_file: string - full path to file that should contain lock.
-        :param verbose: boolean - verbosity, False as default.
-        :return: File lock object if lock was successfully acquired, None otherwise.
+        :param verbose: boolean - log lock status through the module logger, False as default.
+            Acquired messages are logged at INFO level and need logging to be configured.
+        :param timeout: float - seconds to keep retrying while the lock is held elsewhere,
+            0 as default which gives up immediately.
+        :return: File descriptor of the lock file if lock was successfully acquired, None otherwise.
         """
-        try:
-            self.lock = LockFile(lock_file, content_template='{pid}@{hostname}')
-            if verbose:
-                print("Lock Acquired!")
-            fd = open(lock_file)
-            if verbose:
-                print("Lock process: {}".format(fd.read()))
-            return self.lock
-        except LockError:
-            if verbose:
-                print("Lock has already been acquired. Exiting")
-            return None
+        fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except (BlockingIOError, PermissionError):
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    if verbose:
+                        log.warning("Lock has already been acquired. Exiting")
+                    return None
+                time.sleep(LOCK_RETRY_INTERVAL)
+
+        # Record the lock holder only once the lock is ours.
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, '{}@{}'.format(os.getpid(), socket.gethostname()).encode(), 0)
+        self.lock = fd
+        if verbose:
+            log.info("Lock Acquired!")
+            if log.isEnabledFor(logging.INFO):
+                log.info("Lock process: %s", os.pread(fd, 128, 0).decode())
+        return self.lock
 
     def release_lock(self):
         """
         Releases a previously acquired lock.
         """
-        if self.lock:
-            self.lock.close()
+        if self.lock is not None:
+            fcntl.flock(self.lock, fcntl.LOCK_UN)
+            os.close(self.lock)
+            self.lock = None
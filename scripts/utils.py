@@ -1,26 +1,48 @@
 """
 This module contains a number of utility functions.
 """
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Lock
 
-import json
+import atexit
 import logging
 import logging.handlers
+import orjson
 import os
 import platform
+import queue
 import requests
+import time
+from requests.adapters import HTTPAdapter
 
 
 DATE_FORMAT = "%Y-%m-%d"
 DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 LOG_FORMAT = '%(asctime)s.%(msecs)03d %(levelname)-6s %(message)s'
+SLACK_TIMEOUT = 5
+SECONDS_PER_DAY = 60 * 60 * 24
+SYS_LOG_ADDRESS = '/var/run/syslog' if platform.system() == 'Darwin' else '/dev/log'
+
+_SYS_LOGGER = None
+
+# Shared session so that consecutive notifications reuse the HTTPS connection.
+_SLACK_SESSION = requests.Session()
+_SLACK_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_SLACK_EXECUTOR = None
+_SLACK_EXECUTOR_LOCK = Lock()
 
 
 def get_logger_to_file(name, log_file_name, log_rotate_size=None, log_rotate_count=10, log_level=None):
     """
     Creates a logger identified by name that logs to log_file_name. The logger
-    would be set in DEBUG level.
+    would be set in DEBUG level. Records are handed to a background thread through
+    a queue so that file I/O stays off the caller's path, the queue listener is
+    available as the handler's listener attribute and is stopped at exit.
+    Calling it again for the same name returns the already configured logger
+    unchanged, a different log_file_name, rotation setting or log_level is ignored.
     Example:
         logger = get_logger(__name__, '/var/log/log1.log')
         logger.debug('This is a debug level log.')
@@ -43,8 +65,10 @@ def get_logger_to_file(name, log_file_name, log_rotate_size=None, log_rotate_cou
         msg += "then try again."
         print(msg.format(log_file_name))
         return
-    # Get logger.
+    # Get logger, it is configured only once.
     logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.DEBUG)
     if log_rotate_size:
         # Create rotate file handler
@@ -61,8 +85,14 @@ def get_logger_to_file(name, log_file_name, log_rotate_size=None, log_rotate_cou
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(log_formatter)
-    # Now add file hander to logger.
-    logger.addHandler(file_handler)
+    # Now write through the file handler from a queue listener thread.
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.listener = listener
+    logger.addHandler(queue_handler)
 
     return logger
 
@@ -82,9 +112,12 @@ def get_logger_to_console(name, log_level=None):
 
 def get_sys_logger():
     """
-    Setup logging.
+    Setup logging. The logger is built once and reused by later calls.
     :return - return logger.
     """
+    global _SYS_LOGGER
+    if _SYS_LOGGER is not None:
+        return _SYS_LOGGER
     log_file = os.path.splitext(__file__)[0]
 
     # Create logger
@@ -92,30 +125,50 @@ def get_sys_logger():
     logger.setLevel(logging.INFO)
 
     # Ensure that it is logged to syslog
-    log_address = '/dev/log'
-    if platform.system() == 'Darwin':
-        log_address = '/var/run/syslog'
-    handler = logging.handlers.SysLogHandler(address=log_address)
+    handler = logging.handlers.SysLogHandler(address=SYS_LOG_ADDRESS)
     logger.addHandler(handler)
+    _SYS_LOGGER = logger
     return logger
 
 
 def send_slack_notification(webhook_url, username, **kwargs):
     """
-    Send slack notification.
+    Send slack notification. Failures, including timeouts and connection errors, are
+    logged to syslog rather than raised.
     :param webhook_url: string - url to send to. Slack webhook url.
     :param username: string - sender
     """
-    response = requests.post(
-        url=webhook_url,
-        data=json.dumps({"username": username, "attachments": [kwargs]}),
-        headers={'Content-type': 'application/json'}
-    )
+    try:
+        response = _SLACK_SESSION.post(
+            url=webhook_url,
+            data=orjson.dumps({"username": username, "attachments": [kwargs]}),
+            headers={'Content-Type': 'application/json'},
+            timeout=SLACK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        logger = get_sys_logger()
+        logger.error("{} - Could not send slack notification: {}".format(__file__, e))
+        return
     if response.status_code != 200:
         logger = get_sys_logger()
         logger.error("{} - Could not send slack notification.".format(__file__))
 
 
+def send_slack_notification_async(webhook_url, username, **kwargs):
+    """
+    Send slack notification from a background thread so that the caller does not wait on slack.
+    :param webhook_url: string - url to send to. Slack webhook url.
+    :param username: string - sender
+    :return: concurrent.futures.Future of the send_slack_notification call.
+    """
+    global _SLACK_EXECUTOR
+    if _SLACK_EXECUTOR is None:
+        with _SLACK_EXECUTOR_LOCK:
+            if _SLACK_EXECUTOR is None:
+                _SLACK_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+    return _SLACK_EXECUTOR.submit(send_slack_notification, webhook_url, username, **kwargs)
+
+
 def format_timedelta(time_delta, with_micro_secs=False):
     """
     Timedelta formatter for hours:mins:seconds
@@ -124,12 +177,28 @@ def format_timedelta(time_delta, with_micro_secs=False):
     :return: string time formatted as "hours:mins:sec:msec" when with_micro_secs in True, 
         "hours:mins:sec" otherwise.
     """
-    minutes, seconds = divmod(time_delta.seconds + time_delta.days * (60 * 60 * 24), 60)
-    hours, minutes = divmod(minutes, 60)
+    # Whole seconds from days and seconds stay consistent with timedelta.microseconds for
+    # negative deltas.
+    total_seconds = time_delta.days * SECONDS_PER_DAY + time_delta.seconds
     if with_micro_secs:
-        return '{:d}:{:02d}:{:02d}.{:06d}'.format(
-            hours, minutes, seconds, time_delta.microseconds)
-    return '{:d}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+        # Durations with microseconds rarely repeat, so they skip the cache.
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f'{hours:d}:{minutes:02d}:{seconds:02d}.{time_delta.microseconds:06d}'
+    return _format_seconds(total_seconds)
+
+
+@lru_cache(maxsize=1024)
+def _format_seconds(total_seconds):
+    """
+    Memoized "hours:mins:sec" formatter behind format_timedelta, polling loops tend to
+    format the same durations over and over.
+    :param total_seconds: int - whole seconds of the duration.
+    :return: string time formatted as "hours:mins:sec".
+    """
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f'{hours:d}:{minutes:02d}:{seconds:02d}'
 
 
 @contextmanager
@@ -139,11 +208,14 @@ def timer(with_duration=False):
     :param with_duration: boolean indicating whether duration should be printed.
     """
     start_time = datetime.now()
+    # Duration is measured on the monotonic clock so that wall clock adjustments don't skew it.
+    start_ns = time.monotonic_ns()
     try:
         print("Start Time: {}".format(start_time.strftime(DATE_TIME_FORMAT)))
         yield
     finally:
-        end_time = datetime.now()
-        print("\nEnd Time: {}".format(end_time.strftime(DATE_TIME_FORMAT)))
+        end_ns = time.monotonic_ns()
+        print("\nEnd Time: {}".format(datetime.now().strftime(DATE_TIME_FORMAT)))
         if with_duration:
-            print("Duration: {}".format(format_timedelta(end_time-start_time)))
+            duration = timedelta(microseconds=(end_ns - start_ns) // 1000)
+            print("Duration: {}".format(format_timedelta(duration)))
@@ -0,0 +1,39 @@
+import functools
+import os
+import sys
+
+import pytest
+import sqlalchemy
+from sqlalchemy.pool import QueuePool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import database_helper  # noqa: E402
+
+
+@pytest.fixture
+def make_db_helper(tmp_path, monkeypatch):
+    """
+    Factory of DatabaseHelpers backed by a sqlite file, pooled like a mysql/mssql engine.
+    """
+    db_url = 'sqlite:///{}'.format(tmp_path / 'test.db')
+    monkeypatch.setattr(
+        database_helper.DatabaseHelper, 'build_connection_string', staticmethod(lambda **kwargs: db_url))
+    monkeypatch.setattr(
+        database_helper, 'create_engine', functools.partial(
+            sqlalchemy.create_engine, poolclass=QueuePool, connect_args={'check_same_thread': False}))
+    helpers = []
+
+    def make(**kwargs):
+        helper = database_helper.DatabaseHelper('mysql', 'user', 'passwd', 'localhost', **kwargs)
+        helpers.append(helper)
+        return helper
+
+    yield make
+    for helper in helpers:
+        helper.close()
+
+
+@pytest.fixture
+def db_helper(make_db_helper):
+    return make_db_helper()
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from database_helper import PROC_FETCH_SIZE, DatabaseHelper
+
+
+def test_bulk_load_records_non_identifier_columns(db_helper):
+    with db_helper.db_engine.begin() as connection:
+        connection.execute(text('CREATE TABLE records ("a b" INTEGER, "x%y" VARCHAR(10), doc JSON)'))
+
+    records = ({'a b': i, 'x%y': str(i), 'doc': {'i': i}} for i in range(25))
+    db_helper.bulk_load_records('records', records, batch_size=10, commit_every=2)
+
+    rows = db_helper.execute_query('SELECT "a b", "x%y", doc FROM records ORDER BY "a b"')
+    assert len(rows) == 25
+    assert tuple(rows[7]) == (7, '7', '{"i": 7}')
+
+
+def test_execute_query_stream_leaves_connection_options(db_helper):
+    with db_helper.db_engine.connect() as connection:
+        rows = list(db_helper.execute_query('SELECT 1', db_connection=connection, stream=True))
+        assert [tuple(row) for row in rows] == [(1,)]
+        assert 'stream_results' not in connection.get_execution_options()
+        assert 'yield_per' not in connection.get_execution_options()
+
+
+def test_build_connection_string_round_trips_credentials():
+    cxn_str = DatabaseHelper.build_connection_string('mysql', 'u s@r', 'p w+x@/:%', 'localhost', database='db')
+    url = make_url(cxn_str)
+    assert (url.username, url.password, url.host, url.database) == ('u s@r', 'p w+x@/:%', 'localhost', 'db')
+
+
+def test_execute_many_async_and_close(db_helper):
+    futures = db_helper.execute_many_async(['SELECT {}'.format(i) for i in range(5)])
+    assert [tuple(future.result()[0]) for future in futures] == [(i,) for i in range(5)]
+
+    executor = db_helper._executor
+    db_helper.close()
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    assert tuple(db_helper.submit_query('SELECT 7').result()[0]) == (7,)
+    assert db_helper._executor is not executor
+
+
+def test_submit_query_without_overflow_limit(make_db_helper):
+    db_helper = make_db_helper(pool_size=1, max_overflow=-1)
+    assert tuple(db_helper.submit_query('SELECT 1').result()[0]) == (1,)
+
+
+def _mock_proc_connection(monkeypatch, db_helper, batches):
+    cursor = mock.Mock()
+    cursor.fetchmany.side_effect = batches + [[]]
+    connection = mock.Mock()
+    connection.cursor.return_value = cursor
+    monkeypatch.setattr(db_helper.db_engine, 'raw_connection', lambda: connection)
+    return connection, cursor
+
+
+def test_execute_call_procedure_stream_uses_unbuffered_cursor(monkeypatch, db_helper):
+    ss_cursor = object()
+    monkeypatch.setattr(
+        db_helper.db_engine.dialect, 'dbapi', SimpleNamespace(cursors=SimpleNamespace(SSCursor=ss_cursor)))
+    connection, cursor = _mock_proc_connection(monkeypatch, db_helper, [[(1,), (2,)], [(3,)]])
+
+    rows = db_helper.execute_call_procedure('proc', params=[1], stream=True)
+    connection.cursor.assert_not_called()
+    assert list(rows) == [(1,), (2,), (3,)]
+    connection.cursor.assert_called_once_with(ss_cursor)
+    cursor.callproc.assert_called_once_with('proc', [1])
+    assert cursor.arraysize == PROC_FETCH_SIZE
+    connection.commit.assert_called_once_with()
+    connection.close.assert_called_once_with()
+
+
+def test_execute_call_procedure_stream_abandoned_closes_connection(monkeypatch, db_helper):
+    connection, cursor = _mock_proc_connection(monkeypatch, db_helper, [[(1,), (2,)], [(3,)]])
+
+    rows = db_helper.execute_call_procedure('proc', stream=True)
+    assert next(rows) == (1,)
+    rows.close()
+    cursor.close.assert_called_once_with()
+    connection.commit.assert_not_called()
+    connection.close.assert_called_once_with()
@@ -0,0 +1,48 @@
+import logging
+import threading
+import time
+
+from file_lock import FileLock, file_lock
+
+
+def test_contention_is_logged_as_warning(tmp_path, caplog):
+    lock_file = str(tmp_path / 'test.lock')
+    with file_lock(lock_file) as fl:
+        assert fl is not None
+        with caplog.at_level(logging.WARNING):
+            assert FileLock().acquire_lock(lock_file, verbose=True) is None
+    assert 'Lock has already been acquired. Exiting' in caplog.messages
+
+
+def test_verbose_logs_lock_holder(tmp_path, caplog):
+    lock = FileLock()
+    with caplog.at_level(logging.INFO):
+        assert lock.acquire_lock(str(tmp_path / 'test.lock'), verbose=True) is not None
+    lock.release_lock()
+    assert caplog.messages[0] == 'Lock Acquired!'
+    assert caplog.messages[1].startswith('Lock process: ')
+
+
+def test_file_lock_retries_until_released(tmp_path):
+    lock_file = str(tmp_path / 'test.lock')
+    holder = FileLock()
+    assert holder.acquire_lock(lock_file) is not None
+    release = threading.Timer(0.1, holder.release_lock)
+    release.start()
+    try:
+        start = time.monotonic()
+        with file_lock(lock_file, timeout=5) as fl:
+            assert fl is not None
+            assert time.monotonic() - start >= 0.1
+    finally:
+        release.join()
+
+
+def test_file_lock_gives_up_after_timeout(tmp_path):
+    lock_file = str(tmp_path / 'test.lock')
+    with file_lock(lock_file) as fl:
+        assert fl is not None
+        start = time.monotonic()
+        with file_lock(lock_file, timeout=0.1) as contender:
+            assert contender is None
+        assert time.monotonic() - start >= 0.1
@@ -0,0 +1,89 @@
+import atexit
+import logging
+import logging.handlers
+from datetime import timedelta
+from unittest import mock
+
+import orjson
+import pytest
+import requests
+
+import utils
+from utils import format_timedelta
+
+
+def test_format_timedelta():
+    assert format_timedelta(timedelta(days=2, seconds=3725, microseconds=59)) == '49:02:05'
+    assert format_timedelta(timedelta(seconds=59, microseconds=999999), with_micro_secs=True) == '0:00:59.999999'
+
+
+def test_format_timedelta_negative_sub_second():
+    assert format_timedelta(timedelta(microseconds=-5), with_micro_secs=True) == '-1:59:59.999995'
+    assert format_timedelta(timedelta(microseconds=-5)) == '-1:59:59'
+
+
+@pytest.fixture
+def sys_logger(monkeypatch):
+    logger = mock.Mock()
+    monkeypatch.setattr(utils, 'get_sys_logger', lambda: logger)
+    return logger
+
+
+def test_send_slack_notification(monkeypatch, sys_logger):
+    post = mock.Mock(return_value=mock.Mock(status_code=200))
+    monkeypatch.setattr(utils._SLACK_SESSION, 'post', post)
+    utils.send_slack_notification('https://hooks.slack.test', 'bot', text='hello')
+
+    assert orjson.loads(post.call_args.kwargs['data']) == {'username': 'bot', 'attachments': [{'text': 'hello'}]}
+    assert post.call_args.kwargs['timeout'] == utils.SLACK_TIMEOUT
+    sys_logger.error.assert_not_called()
+
+
+def test_send_slack_notification_logs_non_200(monkeypatch, sys_logger):
+    monkeypatch.setattr(utils._SLACK_SESSION, 'post', mock.Mock(return_value=mock.Mock(status_code=500)))
+    utils.send_slack_notification('https://hooks.slack.test', 'bot', text='hello')
+    sys_logger.error.assert_called_once()
+
+
+def test_send_slack_notification_async_logs_request_errors(monkeypatch, sys_logger):
+    monkeypatch.setattr(utils._SLACK_SESSION, 'post', mock.Mock(side_effect=requests.Timeout('timed out')))
+    future = utils.send_slack_notification_async('https://hooks.slack.test', 'bot', text='hello')
+
+    assert future.result() is None
+    sys_logger.error.assert_called_once()
+    assert 'timed out' in sys_logger.error.call_args.args[0]
+
+
+def test_get_logger_to_file_configures_once(tmp_path):
+    log_file = tmp_path / 'test.log'
+    log_file.touch()
+    name = 'test_get_logger_to_file_{}'.format(tmp_path.name)
+    logger = utils.get_logger_to_file(name, str(log_file))
+    assert utils.get_logger_to_file(name, str(log_file), log_level=logging.ERROR) is logger
+
+    [handler] = logger.handlers
+    assert isinstance(handler, logging.handlers.QueueHandler)
+    logger.info('hello')
+    handler.listener.stop()
+    atexit.unregister(handler.listener.stop)
+    logger.removeHandler(handler)
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith('INFO   hello')
+
+
+def test_get_sys_logger_builds_handler_once(monkeypatch):
+    # A UDP address needs no running syslog daemon.
+    monkeypatch.setattr(utils, 'SYS_LOG_ADDRESS', ('localhost', logging.handlers.SYSLOG_UDP_PORT))
+    monkeypatch.setattr(utils, '_SYS_LOGGER', None)
+    logger = utils.get_sys_logger()
+    try:
+        assert utils.get_sys_logger() is logger
+        syslog_handlers = [h for h in logger.handlers if isinstance(h, logging.handlers.SysLogHandler)]
+        assert len(syslog_handlers) == 1
+        assert syslog_handlers[0].address == ('localhost', logging.handlers.SYSLOG_UDP_PORT)
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()